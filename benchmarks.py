@@ -0,0 +1,262 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from streaming_loader import streaming_metrics
+from charts import simulate_portfolios, frontier_figure
+from model_snapshot import ModelSnapshot
+from portfolio_optimizer import PortfolioOptimizer, solve_long_only, _negative_ratio
+from scipy.optimize import BFGS
+from universe import MasterModel
+from discrete_allocation import greedy_allocation, exact_allocation, tracking_error, allocation_cost
+import kernels
+
+
+# Functional Paradigm: synthetic geometric-Brownian price panel for offline benchmarks
+def synthetic_prices(n_days, n_assets, seed=0, freq="B"):
+    rng = np.random.default_rng(seed)
+    drift = rng.normal(0.0003, 0.0002, n_assets)
+    vol = rng.uniform(0.01, 0.03, n_assets)
+    factor = rng.normal(0.0, 0.01, (n_days, 1))
+    noise = rng.normal(0.0, 1.0, (n_days, n_assets)) * vol
+    log_returns = drift + 0.6 * factor + noise
+    prices = 100.0 * np.exp(np.cumsum(log_returns, axis=0))
+    index = pd.date_range("2000-01-03", periods=n_days, freq=freq)
+    columns = [f"S{i:04d}" for i in range(n_assets)]
+    return pd.DataFrame(prices, index=index, columns=columns)
+
+
+def _peak_memory(func, *args, **kwargs):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak / 2**20, elapsed
+
+
+def _in_memory_metrics(path):
+    prices = pd.read_csv(path, index_col=0, parse_dates=True)
+    returns = np.log(prices / prices.shift(1)).dropna()
+    return returns.mean(), returns.cov()
+
+
+def bench_streaming(n_assets=200, lengths=(2500, 10000, 40000), chunksize=2000):
+    print(f"{'rows':>8} {'in-mem MiB':>11} {'stream MiB':>11} {'in-mem s':>9} {'stream s':>9} {'max |dSigma|':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_days in lengths:
+            path = os.path.join(tmp, f"prices_{n_days}.csv")
+            synthetic_prices(n_days, n_assets, freq="min").to_csv(path)
+
+            (mean_ref, cov_ref), mem_ref, t_ref = _peak_memory(_in_memory_metrics, path)
+            (mean, cov, _, _), mem_stream, t_stream = _peak_memory(streaming_metrics, path, chunksize=chunksize)
+
+            assert np.allclose(mean.to_numpy(), mean_ref.to_numpy(), rtol=1e-9, atol=1e-12)
+            error = np.abs(cov.to_numpy() - cov_ref.to_numpy()).max()
+            print(f"{n_days:>8} {mem_ref:>11.1f} {mem_stream:>11.1f} {t_ref:>9.3f} {t_stream:>9.3f} {error:>13.2e}")
+
+
+def bench_charts(n_assets=10, sizes=(1000, 10000, 100000, 1000000)):
+    returns = np.log(synthetic_prices(2500, n_assets)).diff().dropna()
+    pBar, Sigma = returns.mean(), returns.cov()
+    print(f"{'portfolios':>10} {'simulate s':>11} {'figure s':>9} {'payload KiB':>12}")
+    for n_portfolios in sizes:
+        started = time.perf_counter()
+        risk, ret, sharpe = simulate_portfolios(pBar, Sigma, n_portfolios)
+        simulated = time.perf_counter()
+        payload = frontier_figure(risk, ret, sharpe).to_json()
+        built = time.perf_counter()
+        print(f"{n_portfolios:>10} {simulated - started:>11.3f} {built - simulated:>9.3f} {len(payload) / 1024:>12.1f}")
+
+
+def synthetic_optimizer(n_days, n_assets, seed=0, riskFreeRate=0.044):
+    prices = synthetic_prices(n_days, n_assets, seed)
+    snapshot = ModelSnapshot.from_prices((tuple(prices.columns), None, None, None), 1, prices)
+    return PortfolioOptimizer.from_snapshot(snapshot, target_return=7.0, riskFreeRate=riskFreeRate)
+
+
+def bench_solvers(sizes=(10, 50, 200)):
+    print(f"{'assets':>6} {'solver':>16} {'grad':>10} {'nit':>5} {'nfev':>6} {'time s':>8} {'objective':>11}")
+    for n_assets in sizes:
+        optimizer = synthetic_optimizer(2500, n_assets)
+        mu = np.asarray(optimizer.pBar)
+        cov = np.asarray(optimizer.Sigma)
+        vol = np.sqrt(np.diag(cov))
+        problems = {
+            "max_sharpe": (_negative_ratio(mu * 252, cov * 252, optimizer.riskFreeRate), mu - optimizer.riskFreeRate / 252),
+            "max_diversify": (_negative_ratio(vol, cov), vol),
+        }
+        for name, ((fun, jac, hess), warm) in problems.items():
+            w0 = optimizer._warm_start(warm)
+            # Analytic derivatives from the warm start vs finite differences from equal weights
+            for label, args in (
+                ("analytic", (fun, jac, hess, w0)),
+                ("finite-diff", (fun, "2-point", BFGS(), np.full(n_assets, 1.0 / n_assets))),
+            ):
+                started = time.perf_counter()
+                result = solve_long_only(*args)
+                elapsed = time.perf_counter() - started
+                print(f"{n_assets:>6} {name:>16} {label:>10} {result.nit:>5} {result.nfev:>6} {elapsed:>8.3f} {result.fun:>11.6f}")
+
+
+def bench_universe(n_assets=500, n_days=2265, subset_sizes=(10, 50, 250, 500), repeats=50):
+    returns = np.log(synthetic_prices(n_days + 1, n_assets)).diff().dropna()
+    started = time.perf_counter()
+    master = MasterModel(returns)
+    print(f"master build: {time.perf_counter() - started:.3f} s for {n_assets} names x {n_days} days")
+
+    rng = np.random.default_rng(1)
+    print(f"{'subset':>6} {'median ms':>10} {'p95 ms':>8} {'extend +5 ms':>13}")
+    for size in subset_sizes:
+        timings, extend_timings = [], []
+        for _ in range(repeats):
+            tickers = list(rng.choice(returns.columns, size=size, replace=False))
+            first, last = np.sort(rng.choice(n_days, size=2, replace=False))
+            if last - first < size + 1:
+                first, last = 0, n_days - 1
+            started = time.perf_counter()
+            model = master.subset(tickers, returns.index[first], returns.index[last])
+            timings.append(time.perf_counter() - started)
+
+            extra = [t for t in returns.columns[:size + 5] if t not in tickers][:5]
+            if extra and last - first > size + 6:
+                started = time.perf_counter()
+                model.extend(extra)
+                extend_timings.append(time.perf_counter() - started)
+        timings = np.array(timings) * 1000
+        extend_ms = np.median(extend_timings) * 1000 if extend_timings else float("nan")
+        print(f"{size:>6} {np.median(timings):>10.2f} {np.percentile(timings, 95):>8.2f} {extend_ms:>13.2f}")
+
+
+def bench_allocators(sizes=(100, 500, 2000)):
+    print(f"{'assets':>6} {'risk parity s':>14} {'RC spread':>10} {'HRP s':>8} {'inverse s':>10}")
+    for n_assets in sizes:
+        optimizer = synthetic_optimizer(max(2500, 2 * n_assets), n_assets)
+        cov = np.asarray(optimizer.Sigma)
+
+        started = time.perf_counter()
+        w_erc = optimizer.risk_parity_weights()
+        t_erc = time.perf_counter() - started
+        contributions = w_erc * (cov @ w_erc)
+        spread = contributions.max() / contributions.min() - 1
+
+        started = time.perf_counter()
+        optimizer.hrp_weights()
+        t_hrp = time.perf_counter() - started
+
+        started = time.perf_counter()
+        optimizer.singleEquationSolver()
+        t_inv = time.perf_counter() - started
+        print(f"{n_assets:>6} {t_erc:>14.3f} {spread:>10.2e} {t_hrp:>8.3f} {t_inv:>10.3f}")
+
+
+def bench_discrete(n_assets=(10, 50), accounts=(1000, 10000, 100000), exact_accounts=200):
+    rng = np.random.default_rng(0)
+    print(f"{'assets':>6} {'accounts':>9} {'solver':>7} {'accounts/s':>12} {'mean cash $':>12} {'mean TE':>9} {'mean cost $':>12}")
+    for n in n_assets:
+        prices = rng.uniform(5, 500, n)
+        for n_accounts in accounts + (exact_accounts,):
+            weights = rng.dirichlet(np.ones(n), n_accounts)
+            money = rng.uniform(1000, 250000, n_accounts)
+            solvers = [("greedy", greedy_allocation)]
+            if n_accounts == exact_accounts and n <= 20:
+                solvers.append(("exact", exact_allocation))
+            costs = {}
+            for label, solver in solvers:
+                started = time.perf_counter()
+                shares, cash = solver(weights, prices, money)
+                elapsed = time.perf_counter() - started
+                te = tracking_error(shares, weights, prices, money).mean()
+                costs[label] = allocation_cost(shares, weights, prices, money)
+                print(f"{n:>6} {n_accounts:>9} {label:>7} {n_accounts / elapsed:>12.0f} {cash.mean():>12.2f} "
+                      f"{te:>9.2e} {costs[label].mean():>12.2f}")
+            if "exact" in costs:
+                # Deviation plus half the leftover cash (the MILP objective): exact never loses to greedy
+                assert np.all(costs["exact"] <= costs["greedy"] + 1e-6), "exact allocation tracked worse than greedy"
+
+
+def _bootstrap_blocks(returns, n_paths, n_steps, block_bytes=64 * 2**20, seed=0):
+    # Yields bootstrapped (paths, steps, assets) blocks of at most block_bytes each, so the
+    # full path tensor is never materialised
+    rng = np.random.default_rng(seed)
+    values = np.asarray(returns, dtype=float)
+    per_path = n_steps * values.shape[1] * values.itemsize
+    block_paths = max(1, block_bytes // per_path)
+    for start in range(0, n_paths, block_paths):
+        size = min(block_paths, n_paths - start)
+        yield values[rng.integers(0, len(values), (size, n_steps))]
+
+
+def _kernel_calls(asset_paths):
+    target = np.full(asset_paths.shape[2], 1.0 / asset_paths.shape[2])
+    portfolio = kernels.threshold_rebalance(asset_paths, target, 0.05, backend="numpy")[0]
+    wealth = np.cumprod(1.0 + portfolio, axis=1)
+    return {
+        "threshold_rebalance": lambda backend: kernels.threshold_rebalance(asset_paths, target, 0.05, backend=backend),
+        "path_statistics": lambda backend: kernels.path_statistics(portfolio, backend=backend),
+        "max_drawdown": lambda backend: kernels.max_drawdown(wealth, backend=backend),
+    }
+
+
+def bench_kernels(n_paths=2000, n_steps=252, synthetic=((20000, 50), (5000, 500))):
+    bundled = pd.read_excel("stock_data.xlsx", index_col=0, parse_dates=True).pct_change().dropna()
+    cases = [(f"bundled {n_paths}x{bundled.shape[1]}", bundled, n_paths)]
+    for paths, n_assets in synthetic:
+        cases.append((f"synthetic {paths}x{n_assets}", synthetic_prices(2500, n_assets).pct_change().dropna(), paths))
+
+    print(f"backends available: {kernels.BACKENDS}")
+    print(f"{'case':>24} {'kernel':>20} {'backend':>8} {'first s':>8} {'total s':>8} {'identical':>10}")
+    for label, returns, paths in cases:
+        # "first" is one tiny call per backend, i.e. the compile (or cache load) cost
+        first = {}
+        for name, call in _kernel_calls(next(_bootstrap_blocks(returns, 2, n_steps))).items():
+            for backend in kernels.BACKENDS:
+                started = time.perf_counter()
+                call(backend)
+                first[name, backend] = time.perf_counter() - started
+
+        totals = {key: 0.0 for key in first}
+        identical = {key: True for key in first}
+        for asset_paths in _bootstrap_blocks(returns, paths, n_steps):
+            for name, call in _kernel_calls(asset_paths).items():
+                reference = call("numpy")
+                references = reference if isinstance(reference, tuple) else (reference,)
+                for backend in kernels.BACKENDS:
+                    started = time.perf_counter()
+                    result = call(backend)
+                    totals[name, backend] += time.perf_counter() - started
+                    results = result if isinstance(result, tuple) else (result,)
+                    identical[name, backend] &= all(np.array_equal(a, b) for a, b in zip(results, references))
+
+        for name, backend in first:
+            key = (name, backend)
+            print(f"{label:>24} {name:>20} {backend:>8} {first[key]:>8.3f} {totals[key]:>8.3f} {str(identical[key]):>10}")
+
+
+BENCHMARKS = {
+    "streaming": bench_streaming,
+    "allocators": bench_allocators,
+    "charts": bench_charts,
+    "discrete": bench_discrete,
+    "kernels": bench_kernels,
+    "solvers": bench_solvers,
+    "universe": bench_universe,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run, any of {sorted(BENCHMARKS)} (default: all)")
+    args = parser.parse_args()
+    unknown = sorted(set(args.names) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f"unknown benchmarks: {unknown}")
+    for name in args.names or sorted(BENCHMARKS):
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
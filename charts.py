@@ -0,0 +1,112 @@
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+
+
+# Functional Paradigm: random long-only portfolios, evaluated in fixed-size blocks
+def simulate_portfolios(pBar, Sigma, n_portfolios, riskFreeRate=0.044, seed=0, block_size=50000):
+    mu = np.asarray(pBar, dtype=float)
+    cov = np.asarray(Sigma, dtype=float)
+    rng = np.random.default_rng(seed)
+    risk = np.empty(n_portfolios)
+    ret = np.empty(n_portfolios)
+    for start in range(0, n_portfolios, block_size):
+        stop = min(start + block_size, n_portfolios)
+        weights = rng.dirichlet(np.ones(len(mu)), stop - start)
+        ret[start:stop] = weights @ mu * 252
+        risk[start:stop] = np.sqrt(np.einsum("ij,ij->i", weights @ cov, weights) * 252)
+    sharpe = (ret - riskFreeRate) / risk
+    return risk, ret, sharpe
+
+
+def thin_frontier(risk, ret, max_points=3000, n_bins=300, seed=0):
+    # Keeps the best and worst return in every risk bin, so the efficient (upper) edge
+    # and the lower envelope survive, then fills the budget with a uniform sample
+    edges = np.linspace(risk.min(), risk.max(), n_bins + 1)
+    bins = np.clip(np.searchsorted(edges, risk, side="right") - 1, 0, n_bins - 1)
+    order = np.lexsort((ret, bins))
+    sorted_bins = bins[order]
+    first = np.flatnonzero(np.r_[True, sorted_bins[1:] != sorted_bins[:-1]])
+    last = np.r_[first[1:] - 1, len(order) - 1]
+    keep = np.unique(np.concatenate([order[first], order[last]]))
+
+    budget = max_points - len(keep)
+    if budget > 0:
+        rest = np.setdiff1d(np.arange(len(risk)), keep, assume_unique=True)
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(rest, size=min(budget, len(rest)), replace=False)
+        keep = np.concatenate([keep, sample])
+    return np.sort(keep)
+
+
+def density_grid(risk, ret, bins=200):
+    counts, x_edges, y_edges = np.histogram2d(risk, ret, bins=bins)
+    x_centres = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centres = (y_edges[:-1] + y_edges[1:]) / 2
+    return counts.T, x_centres, y_centres
+
+
+def frontier_figure(risk, ret, sharpe, max_points=5000, bins=200):
+    # Small clouds go to the browser as-is (WebGL); large ones become a density heatmap
+    # plus a thinned WebGL overlay, so the payload does not grow with n_portfolios
+    fig = go.Figure()
+    if len(risk) > max_points:
+        counts, x_centres, y_centres = density_grid(risk, ret, bins)
+        fig.add_trace(go.Heatmap(
+            x=x_centres, y=y_centres, z=np.log1p(counts),
+            colorscale="Blues", showscale=False, hoverinfo="skip", name="Density",
+        ))
+        keep = thin_frontier(risk, ret, max_points=max_points, n_bins=bins)
+        risk, ret, sharpe = risk[keep], ret[keep], sharpe[keep]
+
+    fig.add_trace(go.Scattergl(
+        x=risk, y=ret, mode="markers", name="Portfolios",
+        marker=dict(size=3, color=sharpe, colorscale="Viridis", colorbar=dict(title="Sharpe")),
+        hovertemplate="Risk %{x:.2%}<br>Return %{y:.2%}<extra></extra>",
+    ))
+    fig.update_layout(
+        xaxis_title="Annual Volatility", yaxis_title="Expected Annual Return",
+        xaxis_tickformat=".0%", yaxis_tickformat=".0%",
+        margin=dict(t=20, b=0, l=0, r=0), showlegend=False,
+    )
+    return fig
+
+
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+_FIGURE_CACHE_SIZE = 32
+
+
+def cached_figure_json(snapshot, name, params, build):
+    # Serialised figures are keyed by snapshot version, so a refresh invalidates them
+    key = (snapshot.key, snapshot.version, name, params)
+    with _figure_cache_lock:
+        payload = _figure_cache.get(key)
+        if payload is not None:
+            _figure_cache.move_to_end(key)
+            return payload
+    payload = build().to_json()
+    with _figure_cache_lock:
+        _figure_cache[key] = payload
+        while len(_figure_cache) > _FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+    return payload
+
+
+def frontier_chart(snapshot, n_portfolios=100000, riskFreeRate=0.044, highlights=None):
+    def build():
+        risk, ret, sharpe = simulate_portfolios(snapshot.pBar, snapshot.Sigma, n_portfolios, riskFreeRate)
+        return frontier_figure(risk, ret, sharpe)
+
+    figure = json.loads(cached_figure_json(snapshot, "frontier", (n_portfolios, riskFreeRate), build))
+    # Per-request markers are appended to the cached payload, never baked into it
+    for label, (risk, ret) in (highlights or {}).items():
+        figure["data"].append({
+            "type": "scattergl", "x": [risk], "y": [ret], "mode": "markers+text",
+            "text": [label], "textposition": "top center", "name": label,
+            "marker": {"size": 12, "symbol": "star", "color": "#ff4b4b"},
+        })
+    return figure
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import milp, LinearConstraint, Bounds
+
+
+def _as_accounts(weights, money):
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    money = np.broadcast_to(np.asarray(money, dtype=float), (weights.shape[0],)).copy()
+    return weights, money
+
+
+# Functional Paradigm: greedy floor, then repair, vectorised across every account that
+# shares the same price vector
+def greedy_allocation(weights, prices, money):
+    weights, money = _as_accounts(weights, money)
+    prices = np.asarray(prices, dtype=float)
+    target_value = weights * money[:, None]
+    shares = np.floor(target_value / prices).astype(np.int64)
+    cash = money - shares @ prices
+
+    # Buying one more share of asset i changes the squared dollar error by p_i^2 - 2 d_i p_i,
+    # so each round buys, per account, the affordable share with the largest reduction.
+    # After flooring every deficit is below one share, hence at most n rounds.
+    rows = np.arange(len(money))
+    for _ in range(len(prices)):
+        deficit = target_value - shares * prices
+        gain = np.where(prices <= cash[:, None] + 1e-9, 2 * deficit * prices - prices**2, -np.inf)
+        best = np.argmax(gain, axis=1)
+        buy = gain[rows, best] > 0
+        if not buy.any():
+            break
+        shares[rows[buy], best[buy]] += 1
+        cash[buy] -= prices[best[buy]]
+    return shares, cash
+
+
+def allocation_cost(shares, weights, prices, money, cash_weight=0.5):
+    # The exact solver's objective, per account: summed absolute dollar deviation from
+    # target plus cash_weight * leftover cash
+    weights, money = _as_accounts(weights, money)
+    prices = np.asarray(prices, dtype=float)
+    held = np.atleast_2d(shares) * prices
+    deviation = np.abs(weights * money[:, None] - held).sum(axis=1)
+    return deviation + cash_weight * (money - held.sum(axis=1))
+
+
+def exact_allocation(weights, prices, money, cash_weight=0.5):
+    # Small-integer program per account (scipy.optimize.milp): minimise the absolute dollar
+    # deviation from target plus cash_weight * leftover cash, subject to the budget.
+    # cash_weight < 1 makes deviation strictly dearer than idle cash, so spare cash is never
+    # pushed into assets already at or above target.
+    weights, money = _as_accounts(weights, money)
+    prices = np.asarray(prices, dtype=float)
+    n_assets = len(prices)
+    identity = np.eye(n_assets)
+    # variables: [shares (integer), |deviation| (continuous)]; leftover = budget - prices.x
+    cost = np.concatenate([-cash_weight * prices, np.ones(n_assets)])
+    integrality = np.concatenate([np.ones(n_assets), np.zeros(n_assets)])
+    bounds = Bounds(np.zeros(2 * n_assets), np.full(2 * n_assets, np.inf))
+
+    # The greedy pass is both the fallback when HiGHS fails and the bar the result must beat
+    greedy_shares, _ = greedy_allocation(weights, prices, money)
+    shares = greedy_shares.copy()
+    for account, (w, budget) in enumerate(zip(weights, money)):
+        target_value = w * budget
+        constraints = [
+            LinearConstraint(np.hstack([np.diag(prices), identity]), target_value, np.inf),
+            LinearConstraint(np.hstack([-np.diag(prices), identity]), -target_value, np.inf),
+            LinearConstraint(np.concatenate([prices, np.zeros(n_assets)])[None, :], 0, budget),
+        ]
+        result = milp(cost, constraints=constraints, integrality=integrality, bounds=bounds)
+        if result.success and result.x is not None:
+            shares[account] = np.round(result.x[:n_assets]).astype(np.int64)
+
+    # Never return orders that score worse than the greedy pass on the same objective
+    # (solver tolerances and rounding aside)
+    worse = (allocation_cost(shares, weights, prices, money, cash_weight)
+             > allocation_cost(greedy_shares, weights, prices, money, cash_weight))
+    shares[worse] = greedy_shares[worse]
+    return shares, money - shares @ prices
+
+
+def discrete_allocation(weights, prices, money, exact=False, exact_max_assets=20):
+    # weights: (n,) or (accounts, n); money: scalar or (accounts,). Returns integer share
+    # counts and leftover cash per account. The exact solver is only used on small universes.
+    if exact and len(prices) <= exact_max_assets:
+        return exact_allocation(weights, prices, money)
+    return greedy_allocation(weights, prices, money)
+
+
+def tracking_error(shares, weights, prices, money):
+    # Root-mean-square gap between realised and target weights, per account
+    weights, money = _as_accounts(weights, money)
+    realised = np.atleast_2d(shares) * np.asarray(prices, dtype=float) / money[:, None]
+    return np.sqrt(np.mean((realised - weights) ** 2, axis=1))
+
+
+def orders_table(shares, prices):
+    # One account's orders as a table, with prices as a Series indexed by ticker
+    shares = np.asarray(shares).ravel()
+    orders = pd.DataFrame({"Shares": shares, "Price ($)": prices.to_numpy()}, index=prices.index)
+    orders["Value ($)"] = orders["Shares"] * orders["Price ($)"]
+    return orders[orders["Shares"] > 0].round(2)
@@ -0,0 +1,217 @@
+import math
+import os
+
+import numpy as np
+
+# Optional accelerator: Numba is used when installed unless PORTFOLIO_KERNELS=numpy.
+# Kernels are compiled lazily on first call and cached on disk (cache=True), so the
+# compile cost is paid once per machine, not once per process.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ("numpy", "numba") if numba is not None else ("numpy",)
+DEFAULT_BACKEND = os.environ.get("PORTFOLIO_KERNELS", BACKENDS[-1])
+if DEFAULT_BACKEND not in BACKENDS:
+    DEFAULT_BACKEND = "numpy"
+
+
+# ---- Loop kernels (compiled by Numba) ----
+# Every sum is sequential in the same order as the NumPy fallbacks below, which use
+# cumsum/cumprod instead of the pairwise np.sum, so both backends agree bit for bit on
+# every input the public wrappers accept (they reject NaN, inf and zero divisors).
+def _max_drawdown_loop(values):
+    n_paths, n_steps = values.shape
+    out = np.zeros(n_paths)
+    for s in range(n_paths):
+        peak = values[s, 0]
+        worst = 0.0
+        for t in range(n_steps):
+            value = values[s, t]
+            if value > peak:
+                peak = value
+            drawdown = 1.0 - value / peak
+            if drawdown > worst:
+                worst = drawdown
+        out[s] = worst
+    return out
+
+
+def _threshold_rebalance_loop(returns, target, threshold):
+    n_paths, n_steps, n_assets = returns.shape
+    portfolio = np.empty((n_paths, n_steps))
+    turnover = np.zeros(n_paths)
+    rebalances = np.zeros(n_paths, dtype=np.int64)
+    w = np.empty(n_assets)
+    for s in range(n_paths):
+        for j in range(n_assets):
+            w[j] = target[j]
+        for t in range(n_steps):
+            growth = 0.0
+            for j in range(n_assets):
+                w[j] = w[j] * (1.0 + returns[s, t, j])
+                growth += w[j]
+            portfolio[s, t] = growth - 1.0
+            drift = 0.0
+            for j in range(n_assets):
+                w[j] = w[j] / growth
+                gap = abs(w[j] - target[j])
+                if gap > drift:
+                    drift = gap
+            if drift > threshold:
+                traded = 0.0
+                for j in range(n_assets):
+                    traded += abs(w[j] - target[j])
+                    w[j] = target[j]
+                turnover[s] += traded
+                rebalances[s] += 1
+    return portfolio, turnover, rebalances
+
+
+def _path_statistics_loop(returns):
+    n_paths, n_steps = returns.shape
+    out = np.empty((n_paths, 4))
+    for s in range(n_paths):
+        total = 0.0
+        for t in range(n_steps):
+            total += returns[s, t]
+        mean = total / n_steps
+        squares = 0.0
+        for t in range(n_steps):
+            deviation = returns[s, t] - mean
+            squares += deviation * deviation
+        wealth = 1.0
+        peak = 1.0
+        worst = 0.0
+        for t in range(n_steps):
+            wealth = wealth * (1.0 + returns[s, t])
+            if wealth > peak:
+                peak = wealth
+            drawdown = 1.0 - wealth / peak
+            if drawdown > worst:
+                worst = drawdown
+        out[s, 0] = mean
+        out[s, 1] = math.sqrt(squares / (n_steps - 1))
+        out[s, 2] = wealth - 1.0
+        out[s, 3] = worst
+    return out
+
+
+# ---- Pure-NumPy fallbacks: vectorised over paths, same operation order as the loops ----
+def _last(cumulative):
+    return cumulative[..., -1]
+
+
+def _max_drawdown_numpy(values):
+    peak = np.maximum.accumulate(values, axis=1)
+    return np.maximum((1.0 - values / peak).max(axis=1), 0.0)
+
+
+def _threshold_rebalance_numpy(returns, target, threshold):
+    n_paths, n_steps, _ = returns.shape
+    portfolio = np.empty((n_paths, n_steps))
+    turnover = np.zeros(n_paths)
+    rebalances = np.zeros(n_paths, dtype=np.int64)
+    w = np.tile(target, (n_paths, 1))
+    for t in range(n_steps):
+        w = w * (1.0 + returns[:, t, :])
+        growth = _last(np.cumsum(w, axis=1))
+        portfolio[:, t] = growth - 1.0
+        w = w / growth[:, None]
+        gap = np.abs(w - target)
+        rebalance = gap.max(axis=1) > threshold
+        if rebalance.any():
+            turnover[rebalance] += _last(np.cumsum(gap[rebalance], axis=1))
+            rebalances[rebalance] += 1
+            w[rebalance] = target
+    return portfolio, turnover, rebalances
+
+
+def _path_statistics_numpy(returns):
+    n_steps = returns.shape[1]
+    mean = _last(np.cumsum(returns, axis=1)) / n_steps
+    deviation = returns - mean[:, None]
+    std = np.sqrt(_last(np.cumsum(deviation * deviation, axis=1)) / (n_steps - 1))
+    wealth = np.cumprod(1.0 + returns, axis=1)
+    peak = np.maximum(np.maximum.accumulate(wealth, axis=1), 1.0)
+    worst = np.maximum((1.0 - wealth / peak).max(axis=1), 0.0)
+    return np.column_stack([mean, std, wealth[:, -1] - 1.0, worst])
+
+
+_KERNELS = {
+    "numpy": {
+        "max_drawdown": _max_drawdown_numpy,
+        "threshold_rebalance": _threshold_rebalance_numpy,
+        "path_statistics": _path_statistics_numpy,
+    },
+}
+if numba is not None:
+    _KERNELS["numba"] = {
+        "max_drawdown": numba.njit(cache=True)(_max_drawdown_loop),
+        "threshold_rebalance": numba.njit(cache=True)(_threshold_rebalance_loop),
+        "path_statistics": numba.njit(cache=True)(_path_statistics_loop),
+    }
+
+
+def _kernel(name, backend):
+    backend = DEFAULT_BACKEND if backend is None else backend
+    if backend not in _KERNELS:
+        raise ValueError(f"Kernel backend {backend!r} is not available; choose from {BACKENDS}")
+    return _KERNELS[backend][name]
+
+
+def _finite(array, name):
+    # The loops and the NumPy fallbacks treat NaN differently (comparisons vs propagation),
+    # so both backends only agree on finite input; reject anything else up front
+    if not np.isfinite(array).all():
+        raise ValueError(f"{name} must be finite; fill or drop missing values first.")
+    return array
+
+
+# Inputs on which one backend would divide by zero (ZeroDivisionError under Numba, nan with
+# a RuntimeWarning under NumPy) are rejected for the same reason
+def _steps(array, minimum, name):
+    if array.shape[1] < minimum:
+        raise ValueError(f"{name} needs at least {minimum} steps per path, got {array.shape[1]}.")
+    return array
+
+
+def _positive(array, name):
+    if not (array > 0).all():
+        raise ValueError(f"{name} must be strictly positive.")
+    return array
+
+
+# ---- Public API ----
+def max_drawdown(values, backend=None):
+    # values: (paths, steps) wealth or price paths; returns the worst peak-to-trough loss per path
+    values = _finite(np.ascontiguousarray(np.atleast_2d(values), dtype=np.float64), "values")
+    values = _positive(_steps(values, 1, "values"), "values")
+    return _kernel("max_drawdown", backend)(values)
+
+
+def threshold_rebalance(returns, target, threshold=0.05, backend=None):
+    # returns: (steps, assets) or (paths, steps, assets) simple returns. Weights drift with
+    # the market and are reset to target whenever any of them is more than `threshold` away.
+    # Returns per-period portfolio returns, total turnover and the number of rebalances.
+    # Target weights are long-only and every return above -100%, so wealth never hits zero.
+    returns = np.asarray(returns, dtype=np.float64)
+    single = returns.ndim == 2
+    returns = _finite(np.ascontiguousarray(returns[None] if single else returns), "returns")
+    target = _finite(np.ascontiguousarray(target, dtype=np.float64), "target")
+    _positive(1.0 + returns, "1 + returns")
+    if (target < 0).any() or target.sum() <= 0:
+        raise ValueError("target must be non-negative with a positive sum.")
+    portfolio, turnover, rebalances = _kernel("threshold_rebalance", backend)(returns, target, float(threshold))
+    if single:
+        return portfolio[0], turnover[0], rebalances[0]
+    return portfolio, turnover, rebalances
+
+
+def path_statistics(returns, backend=None):
+    # returns: (paths, steps) simulated simple returns; columns are mean, standard deviation
+    # (ddof=1), compounded total return and maximum drawdown of each path
+    returns = _finite(np.ascontiguousarray(np.atleast_2d(returns), dtype=np.float64), "returns")
+    returns = _steps(returns, 2, "returns")
+    return _kernel("path_statistics", backend)(returns)
@@ -0,0 +1,210 @@
+import argparse
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+import charts
+import model_snapshot
+import portfolio_optimizer
+import stress_testing
+import universe
+from benchmarks import synthetic_prices
+
+
+PAGES = {
+    "main": os.path.join(ROOT, "pages", "main.py"),
+    "performance": os.path.join(ROOT, "pages", "performance.py"),
+    "app": os.path.join(ROOT, "app.py"),
+}
+PAGE_FILES = {os.path.abspath(path) for path in PAGES.values()}
+
+
+class StageTimer:
+    # Thread-safe wall-clock samples per named stage
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def timed(self, stage, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - started)
+        return wrapper
+
+
+def _stub_download(n_days, seed=0):
+    def download_data(tickers, start_date, end_date, retries=3, delay=5):
+        prices = synthetic_prices(n_days, len(tickers), seed=seed)
+        prices.columns = list(tickers)
+        prices.index = pd.bdate_range(end=end_date, periods=n_days)
+        return prices
+    return download_data
+
+
+# Functional Paradigm: stub the data provider and time the stages the pages go through,
+# restoring every original on exit so repeated runs in one process do not stack wrappers
+@contextmanager
+def instrumented(timer, keep_sleep=True, n_days=2265):
+    originals = []
+
+    def patch(owner, name, replacement):
+        # Read class attributes from __dict__ so classmethods are restored as classmethods
+        original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+        originals.append((owner, name, original))
+        setattr(owner, name, replacement)
+
+    cls = portfolio_optimizer.PortfolioOptimizer
+    real_sleep = time.sleep
+
+    # Only sleeps issued by the pages themselves are recorded (or skipped)
+    def sleep(seconds):
+        caller = os.path.abspath(sys._getframe(1).f_code.co_filename)
+        if caller not in PAGE_FILES:
+            return real_sleep(seconds)
+        if keep_sleep:
+            timer.timed("page_sleep", real_sleep)(seconds)
+        else:
+            timer.record("page_sleep", 0.0)
+
+    try:
+        patch(portfolio_optimizer, "download_data", _stub_download(n_days))
+        patch(portfolio_optimizer, "load_prices", timer.timed("load_prices", portfolio_optimizer.load_prices))
+        patch(universe.MasterModel, "subset", timer.timed("subset", universe.MasterModel.subset))
+        patch(cls, "from_snapshot", classmethod(timer.timed("optimizer", cls.__dict__["from_snapshot"].__func__)))
+        for name in ("singleEquationSolver", "markowitz_optimal_weights_specific_return", "risk_parity_weights", "hrp_weights"):
+            patch(cls, name, timer.timed(name, cls.__dict__[name]))
+        patch(charts, "frontier_chart", timer.timed("frontier_chart", charts.frontier_chart))
+        patch(stress_testing, "stress_test", timer.timed("stress_test", stress_testing.stress_test))
+        patch(time, "sleep", sleep)
+        yield timer
+    finally:
+        for owner, name, original in reversed(originals):
+            setattr(owner, name, original)
+
+
+def reset_snapshot_stores():
+    for store in list(model_snapshot._stores.values()):
+        store.stop()
+    model_snapshot._stores.clear()
+
+
+def run_session(page, timeout):
+    # One simulated user: open the page, and on the Portfolio page press Calculate
+    timings, errors = {}, []
+    at = AppTest.from_file(PAGES[page], default_timeout=timeout)
+    started = time.perf_counter()
+    at.run()
+    timings[f"{page}:load"] = time.perf_counter() - started
+    if page == "main" and not at.exception:
+        # The page returns before the form when the data load fails; report that, don't crash
+        calculate = next((button for button in at.button if "Calculate" in button.label), None)
+        if calculate is None:
+            errors.append(f"{page}: Calculate button not rendered")
+        else:
+            started = time.perf_counter()
+            calculate.click().run()
+            timings[f"{page}:calculate"] = time.perf_counter() - started
+    errors += [str(exception.value) for exception in at.exception] + [str(error.value) for error in at.error]
+    return timings, errors
+
+
+def _summary(samples):
+    values = np.asarray(samples) * 1000
+    return {
+        "count": len(values),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p90_ms": float(np.percentile(values, 90)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+        "total_s": float(values.sum() / 1000),
+    }
+
+
+def load_test(pages=("main",), sessions=50, concurrency=50, timeout=120, keep_sleep=True, n_days=2265):
+    timer = StageTimer()
+    jobs = [pages[i % len(pages)] for i in range(sessions)]
+    latencies, errors = {}, []
+    with instrumented(timer, keep_sleep, n_days):
+        reset_snapshot_stores()
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                for timings, session_errors in pool.map(lambda page: run_session(page, timeout), jobs):
+                    for name, seconds in timings.items():
+                        latencies.setdefault(name, []).append(seconds)
+                    errors.extend(session_errors)
+            wall = time.perf_counter() - started
+        finally:
+            # Stores built from stubbed data must not outlive the patches
+            reset_snapshot_stores()
+
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "wall_s": wall,
+        "throughput_sessions_per_s": sessions / wall,
+        # ru_maxrss is reported in KiB on Linux
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "latency": {name: _summary(values) for name, values in sorted(latencies.items())},
+        "stages": {name: _summary(values) for name, values in sorted(timer.samples.items())},
+        "errors": errors,
+    }
+
+
+def print_report(report):
+    print(f"sessions={report['sessions']} concurrency={report['concurrency']} "
+          f"wall={report['wall_s']:.2f}s throughput={report['throughput_sessions_per_s']:.2f}/s "
+          f"peak_rss={report['peak_rss_mib']:.0f} MiB errors={len(report['errors'])}")
+    for section in ("latency", "stages"):
+        print(f"\n{section:<28} {'n':>5} {'p50 ms':>9} {'p90 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'total s':>9}")
+        for name, row in report[section].items():
+            print(f"{name:<28} {row['count']:>5} {row['p50_ms']:>9.1f} {row['p90_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+                  f"{row['p99_ms']:>9.1f} {row['max_ms']:>9.1f} {row['total_s']:>9.2f}")
+    for error in sorted(set(report["errors"]))[:10]:
+        print(f"error: {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline concurrent-session load test for the Streamlit pages")
+    parser.add_argument("--pages", nargs="+", default=["main"], help=f"any of {sorted(PAGES)}")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--days", type=int, default=2265, help="length of the stubbed price history")
+    parser.add_argument("--no-sleep", action="store_true", help="skip the pages' time.sleep calls")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+    unknown = sorted(set(args.pages) - set(PAGES))
+    if unknown:
+        parser.error(f"unknown pages: {unknown}")
+
+    report = load_test(args.pages, args.sessions, args.concurrency, args.timeout, not args.no_sleep, args.days)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(report, handle, indent=2)
+    sys.exit(1 if report["errors"] else 0)
@@ -0,0 +1,214 @@
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import portfolio_optimizer
+from universe import MasterModel
+
+
+def _read_only(array):
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    array.setflags(write=False)
+    return array
+
+
+def _as_int64(index):
+    return np.asarray(index.values, dtype="datetime64[ns]").view(np.int64)
+
+
+class ModelSnapshot:
+    # Immutable market model for one universe: every array is read-only and the pandas
+    # objects are views over them, so all sessions can share one instance safely
+    def __init__(self, key, version, tickers, price_dates, prices, return_dates, returns,
+                 mean, cov, built_at=None, _shm=None):
+        self.key = key
+        self.version = version
+        self.built_at = time.time() if built_at is None else built_at
+        self.tickers = tuple(tickers)
+        self.start, self.end, self.excel_file = key[1], key[2], key[3]
+        self._shm = _shm
+
+        self.price_values = _read_only(prices)
+        self.return_values = _read_only(returns)
+        self.mean_values = _read_only(mean)
+        self.cov_values = _read_only(cov)
+
+        columns = pd.Index(self.tickers)
+        self.prices = pd.DataFrame(self.price_values, index=pd.DatetimeIndex(price_dates), columns=columns, copy=False)
+        self.returns = pd.DataFrame(self.return_values, index=pd.DatetimeIndex(return_dates), columns=columns, copy=False)
+        self.pBar = pd.Series(self.mean_values, index=columns, copy=False)
+        self.Sigma = pd.DataFrame(self.cov_values, index=columns, columns=columns, copy=False)
+        self.n_observations = len(self.return_values)
+        self.last_prices = self.prices.ffill().iloc[-1]
+        self._master = None
+        self._master_lock = threading.Lock()
+
+    @property
+    def master(self):
+        # Subset/window model over this snapshot's universe, built once on first use
+        if self._master is None:
+            with self._master_lock:
+                if self._master is None:
+                    self._master = MasterModel(self.returns, self.last_prices, self.excel_file, self.version)
+        return self._master
+
+    @classmethod
+    def from_prices(cls, key, version, prices):
+        if prices is None or prices.empty:
+            raise ValueError("Price data is empty. Cannot build a model snapshot.")
+        returns = np.log(prices / prices.shift(1)).dropna()
+        return cls(
+            key, version, prices.columns, prices.index, prices.to_numpy(),
+            returns.index, returns.to_numpy(), returns.mean().to_numpy(), returns.cov().to_numpy(),
+        )
+
+    # ---- Shared memory export for worker processes ----
+    def _fields(self):
+        return {
+            "prices": self.price_values,
+            "price_dates": _as_int64(self.prices.index),
+            "returns": self.return_values,
+            "return_dates": _as_int64(self.returns.index),
+            "mean": self.mean_values,
+            "cov": self.cov_values,
+        }
+
+    def to_shared_memory(self):
+        fields = self._fields()
+        layout, offset = [], 0
+        for name, array in fields.items():
+            layout.append((name, array.dtype.str, array.shape, offset))
+            offset += array.nbytes
+        block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (name, dtype, shape, start), array in zip(layout, fields.values()):
+            np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)[...] = array
+        handle = {
+            "name": block.name,
+            "layout": layout,
+            "key": self.key,
+            "version": self.version,
+            "built_at": self.built_at,
+            "tickers": self.tickers,
+        }
+        return block, handle
+
+    @classmethod
+    def from_shared_memory(cls, handle):
+        # Attaches without copying; the block stays mapped for the lifetime of the snapshot
+        block = shared_memory.SharedMemory(name=handle["name"])
+        arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+            for name, dtype, shape, start in handle["layout"]
+        }
+        return cls(
+            handle["key"], handle["version"], handle["tickers"],
+            arrays["price_dates"].astype("datetime64[ns]"), arrays["prices"],
+            arrays["return_dates"].astype("datetime64[ns]"), arrays["returns"],
+            arrays["mean"], arrays["cov"], built_at=handle["built_at"], _shm=block,
+        )
+
+
+class SnapshotStore:
+    # Holds the current snapshot of one universe. Readers call current() and never take
+    # a lock; writers build the next snapshot off the request path and publish it with a
+    # single reference assignment, which is atomic under the GIL.
+    def __init__(self, stocks, start, end, excel_file, refresh_interval=None):
+        self.key = (tuple(stocks), start, end, excel_file)
+        self.refresh_interval = refresh_interval
+        self.last_error = None
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._shared = None
+        self._snapshot = self._build(1)
+
+    def _build(self, version):
+        stocks, start, end, excel_file = self.key
+        prices = portfolio_optimizer.load_prices(list(stocks), start, end, excel_file)
+        snapshot = ModelSnapshot.from_prices(self.key, version, prices)
+        # Build the master model here, off the request path, before the snapshot is published
+        snapshot.master
+        return snapshot
+
+    def current(self):
+        return self._snapshot
+
+    def refresh(self):
+        with self._write_lock:
+            try:
+                snapshot = self._build(self._snapshot.version + 1)
+            except Exception as e:
+                # Keep serving the previous snapshot if market data is unavailable
+                self.last_error = e
+                print(f"Snapshot refresh failed: {e}. Keeping version {self._snapshot.version}.")
+                return self._snapshot
+            self.last_error = None
+            self._snapshot = snapshot
+            return snapshot
+
+    def start(self):
+        if self.refresh_interval is None or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._refresh_loop, name=f"snapshot-refresh-{id(self):x}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._release_shared()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def shared_handle(self):
+        # Exports the current snapshot once per version; workers attach with
+        # ModelSnapshot.from_shared_memory(handle)
+        with self._write_lock:
+            snapshot = self._snapshot
+            if self._shared is None or self._shared[0] != snapshot.version:
+                self._release_shared()
+                block, handle = snapshot.to_shared_memory()
+                self._shared = (snapshot.version, block, handle)
+            return self._shared[2]
+
+    def _release_shared(self):
+        if self._shared is not None:
+            # Unlinking keeps existing worker mappings valid until they close them
+            _, block, _ = self._shared
+            block.close()
+            block.unlink()
+            self._shared = None
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# Functional Paradigm: one store per universe, shared by every session in the process
+def get_store(stocks, start, end, excel_file, refresh_interval=6 * 60 * 60):
+    key = (tuple(stocks), start, end, excel_file)
+    store = _stores.get(key)
+    if store is not None:
+        return store
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = SnapshotStore(stocks, start, end, excel_file, refresh_interval)
+            store.start()
+            _stores[key] = store
+    return store
+
+
+def default_store():
+    return get_store(
+        ['AAPL', 'JNJ', 'PG', 'JPM', 'XOM', 'AMZN', 'KO', 'MSFT', 'GOLD', 'CVX'],
+        '2015-01-01',
+        '2023-12-30',
+        "stock_data.xlsx",
+    )
@@ -16,6 +16,39 @@ import warnings
 from PIL import Image
 # from Markuitz.interpretations import  optimization_strategies_info, appinfo ##metric_info, var_info,##
 from portfolio_optimizer import PortfolioOptimizer
+from model_snapshot import default_store
+from charts import frontier_chart
+from stress_testing import historical_scenarios, rolling_scenarios, stress_test, worst_scenarios
+from discrete_allocation import discrete_allocation, orders_table
+
+
+def orders_section(optimizer, weights, money):
+    prices = optimizer.last_prices
+    shares, cash = discrete_allocation(weights, prices.to_numpy(), money, exact=True)
+    st.markdown("##### Whole-Share Orders at Latest Prices")
+    st.table(orders_table(shares[0], prices))
+    st.markdown(f"**Leftover Cash**: ${cash[0]:.2f}")
+
+
+def strategy_tab(optimizer, title, weights, money):
+    sub_summary, sub_distribution = st.tabs(["Summary", "Distribution"])
+    with sub_summary:
+        st.markdown(f"#### {title}")
+        st.markdown(f"**Expected Annual Return**: {optimizer.portfolioReturn(weights):.2%}")
+        st.markdown(f"**Portfolio Risk**: {optimizer.riskFunction(weights):.2%}")
+
+    with sub_distribution:
+        allocations = optimizer.allocation(method=lambda: weights)
+        allocations["allocation"] = allocations["allocation"].apply(lambda x: round(x * 100, 2))
+        allocations.rename(columns={"allocation": "Allocation (%)"}, inplace=True)
+        allocations["Tickers"] = allocations.index
+        st.table(allocations)
+
+        pie_data = allocations[allocations["Allocation (%)"] != 0]
+        fig = px.pie(pie_data, values="Allocation (%)", names="Tickers")
+        fig.update_layout(width=180, height=200, showlegend=False, margin=dict(t=20, b=0, l=0, r=0))
+        st.plotly_chart(fig, use_container_width=True, key=title)
+        orders_section(optimizer, weights, money)
 
 
 def main():
@@ -36,6 +69,13 @@ def main():
     <div class="wave-text">📈 Smart Investing Starts Here</div>
     """, unsafe_allow_html=True)
 
+    try:
+        # One shared, read-only snapshot per universe; refreshed in the background
+        snapshot = default_store().current()
+    except Exception as e:
+        st.error(f"An error occurred: {e}")
+        return
+
     with st.container(border=True):
         st.markdown("### Input Parameters")
         with st.form("portfolio_form"):
@@ -58,19 +98,33 @@ def main():
                 help="Annual return you aim to achieve"
             )
 
+            tickers = st.multiselect(
+                "🏢 Stocks in your portfolio",
+                options=list(snapshot.tickers),
+                default=list(snapshot.tickers),
+                help="Pick at least two stocks from the available universe"
+            )
+
+            window = st.date_input(
+                "📅 History used for the estimates",
+                value=(snapshot.returns.index[0].date(), snapshot.returns.index[-1].date()),
+                min_value=snapshot.returns.index[0].date(),
+                max_value=snapshot.returns.index[-1].date(),
+            )
+
             calculate = st.form_submit_button("🚀 Calculate")
 
     if calculate:
         with st.spinner("Buckle Up! Financial Wizardry in Progress...."):
             try:
-                optimizer = PortfolioOptimizer(
-                    ['AAPL', 'JNJ', 'PG', 'JPM', 'XOM', 'AMZN', 'KO', 'MSFT', 'GOLD', 'CVX'],
-                    '2015-01-01',
-                    '2023-12-30',
-                    "stock_data.xlsx",
-                    UserReturn,
-                    0.044,
-                )
+                if len(tickers) < 2:
+                    raise ValueError("Please select at least two stocks.")
+                # A single picked date means "from this date to the end of the history"
+                start = window[0] if len(window) > 0 else None
+                end = window[1] if len(window) > 1 else None
+                # Subset mean/covariance come from the master model by indexing, no reload
+                model = snapshot.master.subset(tickers, start, end)
+                optimizer = PortfolioOptimizer.from_snapshot(model, UserReturn, 0.044)
 
                 optimizer.optimized_allocation["allocation"] = optimizer.optimized_allocation["allocation"].apply(lambda x: round(x * 100, 2))
                 optimizer.optimized_allocation.rename(columns={"allocation": "Allocation (%)"}, inplace=True)
@@ -80,7 +134,11 @@ def main():
                 return
 
         with st.container(border=True):
-            main_tab1, main_tab2 = st.tabs(["Strategy: Minimum Risk", "Strategy: Target Return"])
+            main_tab1, main_tab2, main_tab3, main_tab4, main_tab5, main_tab6 = st.tabs([
+                "Strategy: Minimum Risk", "Strategy: Target Return",
+                "Strategy: Risk Parity", "Strategy: HRP",
+                "Efficient Frontier", "Stress Test",
+            ])
 
             # ---- Minimum Risk ----
             with main_tab1:
@@ -102,7 +160,9 @@ def main():
                     pie_data = allocations[allocations["Allocation (%)"] != 0]
                     fig = px.pie(pie_data, values="Allocation (%)", names="Tickers")
                     fig.update_layout(width=180, height=200, showlegend=False, margin=dict(t=20, b=0, l=0, r=0))
-                    st.plotly_chart(fig, use_container_width=True)
+                    # Identical pies get identical element ids, so every chart needs its own key
+                    st.plotly_chart(fig, use_container_width=True, key="min_risk_pie")
+                    orders_section(optimizer, w_opt_min, money)
 
             # ---- Target Return ----
             with main_tab2:
@@ -121,6 +181,8 @@ def main():
                     investment_required = np.sum(w_opt_target) * money
                     st.markdown(f"**To achieve your target return of {UserReturn:.2f}%, you need to invest:** ${investment_required:.2f}")
                     st.caption("Note: The sum of weights exceeds 1 because the optimizer adjusts allocations to meet your return target.")
+                    if np.sum(w_opt_target) > 0:
+                        orders_section(optimizer, w_opt_target / np.sum(w_opt_target), investment_required)
 
                     # required_investment = np.sum(w_opt_target) * money
                     # st.markdown(f"💸 **Required Investment:** ${required_investment:.2f}")
@@ -133,7 +195,45 @@ def main():
                     pie_data_target = allocations_target[allocations_target["Allocation (%)"] != 0]
                     fig = px.pie(pie_data_target, values="Allocation (%)", names="Tickers")
                     fig.update_layout(width=180, height=200, showlegend=False, margin=dict(t=20, b=0, l=0, r=0))
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True, key="target_return_pie")
+
+            # ---- Risk Parity ----
+            with main_tab3:
+                w_opt_erc = optimizer.risk_parity_weights()
+                strategy_tab(optimizer, "Portfolio with Equal Risk Contributions", w_opt_erc, money)
+
+            # ---- Hierarchical Risk Parity ----
+            with main_tab4:
+                w_opt_hrp = optimizer.hrp_weights()
+                strategy_tab(optimizer, "Hierarchical Risk Parity Portfolio", w_opt_hrp, money)
+
+            # ---- Efficient Frontier ----
+            with main_tab5:
+                st.markdown("#### Simulated Portfolios and Your Strategies")
+                fig = frontier_chart(model, highlights={
+                    "Minimum Risk": (np.sqrt(risk_min), return_min),
+                    "Target Return": (np.sqrt(risk_target), return_target),
+                    "Risk Parity": (np.sqrt(optimizer.riskFunction(w_opt_erc)), optimizer.portfolioReturn(w_opt_erc)),
+                    "HRP": (np.sqrt(optimizer.riskFunction(w_opt_hrp)), optimizer.portfolioReturn(w_opt_hrp)),
+                })
+                st.plotly_chart(fig, use_container_width=True, key="frontier")
+
+            # ---- Stress Test ----
+            with main_tab6:
+                st.markdown("#### Worst Historical Scenarios for Your Investment")
+                scenarios = pd.concat([
+                    historical_scenarios(optimizer.returns),
+                    # Non-overlapping windows, so one crash is not ranked ten times over
+                    rolling_scenarios(optimizer.returns, window=21, step=21),
+                ])
+                pnl = stress_test(scenarios, {
+                    "Minimum Risk ($)": w_opt_min,
+                    "Target Return ($)": w_opt_target,
+                    "Risk Parity ($)": w_opt_erc,
+                    "HRP ($)": w_opt_hrp,
+                }, money)
+                st.table(worst_scenarios(pnl, n=10).round(2))
+                st.caption("Scenarios: named market episodes fully inside the history plus consecutive, non-overlapping 21-trading-day windows.")
 
     # Navigation Buttons
     time.sleep(1)
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import time
 
+from model_snapshot import default_store
+from charts import frontier_chart
+
 
 st.title("📊 Strategy Risk Reduction Report (2015–2024)")
 
@@ -82,4 +85,15 @@ st.markdown("""
     - Allocation Weights with Charts
 
     
-""")
\ No newline at end of file
+""")
+
+try:
+    snapshot = default_store().current()
+except Exception as e:
+    st.error(f"An error occurred: {e}")
+    snapshot = None
+
+if snapshot is not None:
+    with st.container(border=True):
+        st.markdown("#### Risk-Return Cloud of Simulated Portfolios")
+        st.plotly_chart(frontier_chart(snapshot), use_container_width=True)
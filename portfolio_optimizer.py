@@ -4,10 +4,14 @@ import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 import plotly.express as px
-from scipy.optimize import minimize
+from scipy.optimize import minimize, Bounds, LinearConstraint
+from scipy.cluster.hierarchy import linkage, leaves_list
+from scipy.spatial.distance import squareform
 import time
 import os
 
+from streaming_loader import streaming_metrics
+
 # Functional Paradigm: Data downloading with retry mechanism
 def download_data(tickers, start_date, end_date, retries=3, delay=5):
     for _ in range(retries):
@@ -21,39 +25,124 @@ def download_data(tickers, start_date, end_date, retries=3, delay=5):
     print("Failed to download data. Switching to Excel backup...")
     return None
 
+def load_prices(tickers, start_date, end_date, excel_file):
+    prices = download_data(tickers, start_date, end_date)
+    if prices is None:
+        prices = pd.read_excel(excel_file, index_col=0, parse_dates=True)
+    return prices
+
+# Functional Paradigm: f(w) = -(c.w - offset) / sqrt(w'Qw) with exact gradient and Hessian,
+# shared by the Sharpe (c = annual mean, Q = annual Sigma) and diversification ratios
+def _negative_ratio(c, Q, offset=0.0):
+    def parts(w):
+        Qw = Q @ w
+        s = np.sqrt(w @ Qw)
+        return Qw / s, s, c @ w - offset
+
+    def fun(w):
+        _, s, a = parts(w)
+        return -a / s
+
+    def jac(w):
+        ds, s, a = parts(w)
+        return -(c * s - a * ds) / s**2
+
+    def hess(w):
+        ds, s, a = parts(w)
+        d2s = (Q - np.outer(ds, ds)) / s
+        cross = np.outer(c, ds)
+        return (cross + cross.T) / s**2 + a * d2s / s**2 - 2 * a * np.outer(ds, ds) / s**3
+    return fun, jac, hess
+
+
+# Long-only, fully invested: 0 <= w <= 1 and sum(w) = 1
+def solve_long_only(fun, jac, hess, w0):
+    n = len(w0)
+    return minimize(
+        fun, w0, jac=jac, hess=hess, method="trust-constr",
+        bounds=Bounds(np.zeros(n), np.ones(n)),
+        constraints=[LinearConstraint(np.ones((1, n)), 1.0, 1.0)],
+        options={"gtol": 1e-10, "xtol": 1e-10},
+    )
+
+
 class PortfolioOptimizer:
-    def __init__(self, stocks, start, end, excel_file, target_return, riskFreeRate=0.044):
+    def __init__(self, stocks, start, end, excel_file, target_return, riskFreeRate=0.044, chunksize=None):
+        self._set_inputs(stocks, start, end, excel_file, target_return, riskFreeRate, chunksize)
+
+        if chunksize is not None:
+            # Streaming path: excel_file may be an .xlsx/.csv panel or a {ticker: csv} dict;
+            # only running moments of the requested stocks are kept, never the full history
+            pBar, Sigma, last_prices, n_observations = streaming_metrics(
+                self.excel_file, self.start, self.end, tickers=self.stocks, chunksize=chunksize
+            )
+            self._set_moments(None, None, pBar, Sigma, last_prices, n_observations)
+        else:
+            prices = self.basicMetrics()
+            if prices is None or prices.empty:
+                raise ValueError("Price data is empty. Cannot initialize weights.")
+
+            returns = np.log(prices / prices.shift(1)).dropna()
+            self._set_moments(
+                prices, returns, returns.mean(), returns.cov(), prices.ffill().iloc[-1], len(returns)
+            )
+
+    @classmethod
+    def from_snapshot(cls, snapshot, target_return, riskFreeRate=0.044):
+        # Reuses the snapshot's read-only prices, pBar and Sigma without copying, and leaves
+        # the return history with the snapshot until something reads it, so per-session
+        # optimizers only own their weights and allocation table
+        self = cls.__new__(cls)
+        self._set_inputs(
+            list(snapshot.tickers), snapshot.start, snapshot.end, snapshot.excel_file,
+            target_return, riskFreeRate, None,
+        )
+        self._set_moments(
+            snapshot.prices, None, snapshot.pBar, snapshot.Sigma, snapshot.last_prices, snapshot.n_observations
+        )
+        self._snapshot = snapshot
+        return self
+
+    # Both constructors go through these two helpers, so every attribute is set in one place
+    def _set_inputs(self, stocks, start, end, excel_file, target_return, riskFreeRate, chunksize):
         self.stocks = stocks
         self.start = start
         self.end = end
         self.excel_file = excel_file
         self.target_return = target_return
         self.riskFreeRate = riskFreeRate
-
-        self.prices = self.basicMetrics()
-        if self.prices is not None and not self.prices.empty:
-            n_assets = len(self.prices.columns)
-            self.weights = np.array([1.0 / n_assets] * n_assets)
-        else:
-            raise ValueError("Price data is empty. Cannot initialize weights.")
-
-        self.returns = np.log(self.prices / self.prices.shift(1)).dropna()
-        self.pBar = self.returns.mean()
-        self.Sigma = self.returns.cov()
+        self.chunksize = chunksize
+        self._snapshot = None
+
+    def _set_moments(self, prices, returns, pBar, Sigma, last_prices, n_observations):
+        self.prices = prices
+        self._returns = returns
+        self.pBar = pBar
+        self.Sigma = Sigma
+        self.last_prices = last_prices
+        self.n_observations = n_observations
+        n_assets = len(self.pBar)
+        self.weights = np.array([1.0 / n_assets] * n_assets)
         self.meanReturns, self.covMatrix = self.pBar, self.Sigma
         self.optimized_allocation = self.allocation()
 
+    @property
+    def returns(self):
+        if self._returns is None and self._snapshot is not None:
+            return self._snapshot.returns
+        return self._returns
+
     def basicMetrics(self):
-        prices = download_data(self.stocks, self.start, self.end)
-        if prices is None:
-            try:
-                prices = pd.read_excel(self.excel_file, index_col=0, parse_dates=True)
-            except FileNotFoundError:
-                st.error(f"❌ Excel file '{self.excel_file}' not found. Please upload it.")
-                raise
+        try:
+            prices = load_prices(self.stocks, self.start, self.end, self.excel_file)
+        except FileNotFoundError:
+            st.error(f"❌ Excel file '{self.excel_file}' not found. Please upload it.")
+            raise
         return prices
 
     def getData(self):
+        if self._returns is None:
+            return self.pBar, self.Sigma
         meanReturns = self.returns.mean()
         covMatrix = self.returns.cov()
         return meanReturns, covMatrix
@@ -94,6 +183,107 @@ class PortfolioOptimizer:
         w_opt = np.maximum(w_opt, 0)
         return w_opt
 
+    def _warm_start(self, vector):
+        # Unconstrained solution of Sigma x = vector clipped to long-only, falling back
+        # to inverse-volatility weights when it has no positive mass
+        cov = np.asarray(self.Sigma, dtype=float)
+        try:
+            w0 = np.maximum(np.linalg.solve(cov, np.asarray(vector, dtype=float)), 0)
+        except np.linalg.LinAlgError:
+            w0 = np.zeros(len(cov))
+        if w0.sum() <= 0:
+            w0 = 1.0 / np.sqrt(np.diag(cov))
+        return w0 / w0.sum()
+
+    def _solve(self, fun, jac, hess, w0):
+        result = solve_long_only(fun, jac, hess, w0)
+        self.last_solve = result
+        w_opt = np.maximum(result.x, 0)
+        return w_opt / np.sum(w_opt)
+
+    def max_sharpe_weights(self):
+        mu = np.asarray(self.pBar, dtype=float)
+        cov = np.asarray(self.Sigma, dtype=float)
+        fun, jac, hess = _negative_ratio(mu * 252, cov * 252, self.riskFreeRate)
+        return self._solve(fun, jac, hess, self._warm_start(mu - self.riskFreeRate / 252))
+
+    def max_utility_weights(self, risk_aversion=3.0):
+        # maximise annual return - risk_aversion / 2 * annual variance
+        mu = np.asarray(self.pBar, dtype=float) * 252
+        cov = np.asarray(self.Sigma, dtype=float) * 252
+
+        def fun(w):
+            return -(mu @ w) + 0.5 * risk_aversion * (w @ cov @ w)
+
+        def jac(w):
+            return -mu + risk_aversion * (cov @ w)
+
+        def hess(w):
+            return risk_aversion * cov
+
+        return self._solve(fun, jac, hess, self._warm_start(mu / risk_aversion))
+
+    def max_diversification_weights(self):
+        cov = np.asarray(self.Sigma, dtype=float)
+        vol = np.sqrt(np.diag(cov))
+        fun, jac, hess = _negative_ratio(vol, cov)
+        return self._solve(fun, jac, hess, self._warm_start(vol))
+
+    def risk_parity_weights(self, budgets=None, tol=1e-10, max_sweeps=500):
+        # Equal (or budgeted) risk contribution by cyclical coordinate descent on
+        # min 1/2 y'Sigma y - sum(b log y): each coordinate has a closed-form root and
+        # Sigma y is updated by one column, so a sweep is O(n^2) with no inversion
+        cov = np.asarray(self.Sigma, dtype=float)
+        n_assets = len(cov)
+        b = np.full(n_assets, 1.0 / n_assets) if budgets is None else np.asarray(budgets, dtype=float) / np.sum(budgets)
+        diag = np.diag(cov)
+        y = 1.0 / np.sqrt(diag)
+        y *= np.sqrt(1.0 / (y @ cov @ y))
+        Sy = cov @ y
+        for _ in range(max_sweeps):
+            y_prev = y.copy()
+            for i in range(n_assets):
+                off_diag = Sy[i] - diag[i] * y[i]
+                y_new = (-off_diag + np.sqrt(off_diag**2 + 4 * diag[i] * b[i])) / (2 * diag[i])
+                Sy += cov[:, i] * (y_new - y[i])
+                y[i] = y_new
+            if np.max(np.abs(y - y_prev)) <= tol * np.max(np.abs(y)):
+                break
+        return y / np.sum(y)
+
+    def _cluster_variance(self, cov, items):
+        sub_cov = cov[np.ix_(items, items)]
+        ivp = 1.0 / np.diag(sub_cov)
+        ivp /= ivp.sum()
+        return ivp @ sub_cov @ ivp
+
+    def hrp_weights(self, linkage_method="single"):
+        # Hierarchical risk parity (Lopez de Prado): cluster on correlation distance,
+        # order assets by the dendrogram leaves, then split the ordered list in halves
+        # level by level, sharing weight in inverse proportion to cluster variance
+        cov = np.asarray(self.Sigma, dtype=float)
+        vol = np.sqrt(np.diag(cov))
+        corr = np.clip(cov / np.outer(vol, vol), -1.0, 1.0)
+        distance = np.sqrt(np.clip((1.0 - corr) / 2.0, 0.0, None))
+        order = leaves_list(linkage(squareform(distance, checks=False), method=linkage_method))
+
+        w_opt = np.ones(len(cov))
+        clusters = [order]
+        while clusters:
+            next_clusters = []
+            for items in clusters:
+                if len(items) < 2:
+                    continue
+                left, right = items[:len(items) // 2], items[len(items) // 2:]
+                var_left = self._cluster_variance(cov, left)
+                var_right = self._cluster_variance(cov, right)
+                alpha = 1.0 - var_left / (var_left + var_right)
+                w_opt[left] *= alpha
+                w_opt[right] *= 1.0 - alpha
+                next_clusters.extend([left, right])
+            clusters = next_clusters
+        return w_opt / np.sum(w_opt)
+
     def allocation(self, method=None, U=None):
         if method is None:
             method = self.singleEquationSolver
@@ -0,0 +1,173 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Functional Paradigm: chunked readers, each yielding wide price frames (dates x tickers)
+def _price_column(frame):
+    for name in ("Adj Close", "Close"):
+        if name in frame.columns:
+            return frame[name]
+    return frame.iloc[:, -1]
+
+
+def _iter_csv_chunks(path, chunksize):
+    for chunk in pd.read_csv(path, index_col=0, parse_dates=True, chunksize=chunksize):
+        yield chunk
+
+
+def _iter_excel_chunks(path, chunksize):
+    # read_only mode streams rows from the sheet XML instead of building the whole workbook
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows)
+        columns = [str(name) for name in header[1:]]
+        buffer = []
+        for row in rows:
+            if row[0] is None:
+                continue
+            buffer.append(row)
+            if len(buffer) >= chunksize:
+                yield _rows_to_frame(buffer, columns)
+                buffer = []
+        if buffer:
+            yield _rows_to_frame(buffer, columns)
+    finally:
+        workbook.close()
+
+
+def _rows_to_frame(rows, columns):
+    index = pd.to_datetime([row[0] for row in rows])
+    values = [row[1:len(columns) + 1] for row in rows]
+    return pd.DataFrame(values, index=index, columns=columns, dtype=float)
+
+
+def _iter_aligned_ticker_chunks(files, chunksize):
+    # One CSV per ticker: merge the files by date, emitting only the rows that every
+    # still-open reader has already passed (the watermark), so calendars line up
+    readers = {
+        ticker: pd.read_csv(path, index_col=0, parse_dates=True, chunksize=chunksize)
+        for ticker, path in files.items()
+    }
+    buffers = {ticker: pd.Series(dtype=float, index=pd.DatetimeIndex([])) for ticker in files}
+    exhausted = set()
+
+    while len(exhausted) < len(readers):
+        for ticker, reader in readers.items():
+            if ticker in exhausted or len(buffers[ticker]) >= chunksize:
+                continue
+            try:
+                chunk = next(reader)
+            except StopIteration:
+                exhausted.add(ticker)
+                continue
+            buffers[ticker] = pd.concat([buffers[ticker], _price_column(chunk).astype(float)])
+
+        open_ends = [
+            buffers[ticker].index[-1]
+            for ticker in readers
+            if ticker not in exhausted and len(buffers[ticker])
+        ]
+        if len(exhausted) == len(readers):
+            watermark = None
+        elif len(open_ends) < len(readers) - len(exhausted):
+            continue
+        else:
+            watermark = min(open_ends)
+
+        emitted = {}
+        for ticker, buffer in buffers.items():
+            mask = np.ones(len(buffer), dtype=bool) if watermark is None else buffer.index <= watermark
+            emitted[ticker] = buffer[mask]
+            buffers[ticker] = buffer[~mask]
+        frame = pd.concat(emitted, axis=1).sort_index()
+        if not frame.empty:
+            yield frame
+
+
+def iter_price_chunks(source, chunksize=10000):
+    if isinstance(source, dict):
+        return _iter_aligned_ticker_chunks(source, chunksize)
+    extension = os.path.splitext(str(source))[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        return _iter_excel_chunks(source, chunksize)
+    if extension in (".csv", ".txt", ".gz"):
+        return _iter_csv_chunks(source, chunksize)
+    raise ValueError(f"Unsupported price source for streaming: {source!r}")
+
+
+class StreamingMoments:
+    # Running mean and co-moment matrix, merged block by block (Chan et al. pairwise update)
+    def __init__(self, columns):
+        self.columns = list(columns)
+        n_assets = len(self.columns)
+        self.count = 0
+        self.mean = np.zeros(n_assets)
+        self.m2 = np.zeros((n_assets, n_assets))
+
+    def update(self, block):
+        block = np.asarray(block, dtype=float)
+        n_rows = block.shape[0]
+        if n_rows == 0:
+            return
+        block_mean = block.mean(axis=0)
+        centred = block - block_mean
+        delta = block_mean - self.mean
+        total = self.count + n_rows
+        self.m2 += centred.T @ centred + np.outer(delta, delta) * (self.count * n_rows / total)
+        self.mean += delta * (n_rows / total)
+        self.count = total
+
+    def covariance(self):
+        if self.count < 2:
+            raise ValueError("At least two return observations are needed for a covariance.")
+        return self.m2 / (self.count - 1)
+
+    def to_pandas(self):
+        mean = pd.Series(self.mean, index=self.columns)
+        cov = pd.DataFrame(self.covariance(), index=self.columns, columns=self.columns)
+        return mean, cov
+
+
+# Mean log return, covariance and last prices without holding the full history.
+# Gaps inside the history are forward-filled; rows before every ticker has its first
+# price are skipped, as dropna does on the in-memory path. Peak memory is bounded by
+# chunksize rows, not by the length of the history.
+def streaming_metrics(source, start=None, end=None, tickers=None, chunksize=10000):
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+
+    moments = None
+    last_row = None
+    for chunk in iter_price_chunks(source, chunksize):
+        if start is not None:
+            chunk = chunk[chunk.index >= start]
+        if end is not None:
+            chunk = chunk[chunk.index <= end]
+        if chunk.empty:
+            continue
+
+        if moments is None:
+            columns = list(chunk.columns) if tickers is None else list(tickers)
+            missing = [ticker for ticker in columns if ticker not in chunk.columns]
+            if missing:
+                raise ValueError(f"Tickers not found in price source: {missing}")
+            moments = StreamingMoments(columns)
+        chunk = chunk.reindex(columns=moments.columns)
+
+        # Carry the previous chunk's last prices so returns and ffill span the boundary
+        prices = chunk if last_row is None else pd.concat([last_row, chunk])
+        prices = prices.ffill()
+        log_returns = np.log(prices / prices.shift(1)).iloc[1:]
+        moments.update(log_returns.dropna().to_numpy())
+        last_row = prices.iloc[[-1]]
+
+    if moments is None or moments.count < 2:
+        raise ValueError("Price data is empty. Cannot initialize weights.")
+
+    mean, cov = moments.to_pandas()
+    return mean, cov, last_row.iloc[0], moments.count
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+
+HISTORICAL_EPISODES = {
+    "Aug 2015 China devaluation": ("2015-08-17", "2015-08-25"),
+    "Early 2016 oil slump": ("2015-12-29", "2016-02-11"),
+    "Q4 2018 sell-off": ("2018-10-03", "2018-12-24"),
+    "COVID-19 crash (Mar 2020)": ("2020-02-19", "2020-03-23"),
+    "2022 rate-hike bear market": ("2022-01-03", "2022-10-12"),
+}
+
+
+def _cumulative_log_returns(returns):
+    values = np.asarray(returns, dtype=float)
+    return np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+
+
+# Functional Paradigm: every scenario builder returns a (scenarios x assets) frame of simple returns
+def historical_scenarios(returns, episodes=None):
+    episodes = HISTORICAL_EPISODES if episodes is None else episodes
+    names = list(episodes)
+    first = pd.to_datetime([episodes[name][0] for name in names])
+    last = pd.to_datetime([episodes[name][1] for name in names])
+    starts = returns.index.searchsorted(first, side="left")
+    ends = returns.index.searchsorted(last, side="right")
+    # Only episodes entirely inside the history; a clipped one would understate its loss
+    covered = np.zeros(len(names), dtype=bool)
+    if len(returns):
+        covered = (returns.index[0] <= first) & (returns.index[-1] >= last)
+    cumulative = _cumulative_log_returns(returns)
+    shocks = np.expm1(cumulative[ends[covered]] - cumulative[starts[covered]])
+    return pd.DataFrame(shocks, index=[name for name, ok in zip(names, covered) if ok], columns=returns.columns)
+
+
+def rolling_scenarios(returns, window=21, step=1):
+    # Historical windows of `window` trading days starting every `step` days, from one
+    # prefix-sum difference; step=window gives non-overlapping windows
+    cumulative = _cumulative_log_returns(returns)
+    starts = np.arange(0, len(returns) - window + 1, step)
+    shocks = np.expm1(cumulative[starts + window] - cumulative[starts])
+    labels = [
+        f"{returns.index[i]:%Y-%m-%d} → {returns.index[i + window - 1]:%Y-%m-%d}"
+        for i in starts
+    ]
+    return pd.DataFrame(shocks, index=labels, columns=returns.columns)
+
+
+def asset_shock_scenarios(shocks, tickers):
+    # shocks: {scenario name: {ticker: simple return}}; unlisted assets are unshocked
+    frame = pd.DataFrame.from_dict(shocks, orient="index")
+    return frame.reindex(columns=list(tickers)).fillna(0.0).astype(float)
+
+
+def factor_betas(returns, factor_returns):
+    # OLS exposures of each asset to the factors over their common dates
+    factors = factor_returns.reindex(returns.index).dropna()
+    assets = returns.loc[factors.index]
+    design = np.column_stack([np.ones(len(factors)), factors.to_numpy()])
+    coefficients, *_ = np.linalg.lstsq(design, assets.to_numpy(), rcond=None)
+    return pd.DataFrame(coefficients[1:].T, index=returns.columns, columns=factors.columns)
+
+
+def factor_scenarios(factor_shocks, exposures):
+    # factor_shocks: (scenarios x factors), exposures: (assets x factors), e.g. a +200 bp
+    # rate shock of 0.02 against per-asset rate sensitivities
+    factor_shocks = factor_shocks.reindex(columns=exposures.columns).fillna(0.0)
+    return pd.DataFrame(
+        factor_shocks.to_numpy() @ exposures.to_numpy().T,
+        index=factor_shocks.index,
+        columns=exposures.index,
+    )
+
+
+def _as_weight_series(weights, tickers):
+    if isinstance(weights, pd.DataFrame):
+        return weights.iloc[:, 0]
+    if isinstance(weights, pd.Series):
+        return weights
+    # Plain arrays are taken to be in the scenarios' column order
+    return pd.Series(np.asarray(weights, dtype=float), index=list(tickers))
+
+
+def _weight_matrix(weights, tickers):
+    # Accepts one allocation() frame or weight vector, a {name: weights} dict,
+    # or an (assets x portfolios) frame
+    if isinstance(weights, dict):
+        weights = pd.concat(
+            {name: _as_weight_series(w, tickers) for name, w in weights.items()}, axis=1
+        )
+    elif not isinstance(weights, pd.DataFrame):
+        weights = _as_weight_series(weights, tickers).to_frame()
+    return weights.reindex(list(tickers)).fillna(0.0).astype(float)
+
+
+def stress_test(scenarios, weights, money):
+    # P&L of every (scenario, portfolio) pair in one matrix product
+    weight_matrix = _weight_matrix(weights, scenarios.columns)
+    pnl = scenarios.to_numpy() @ weight_matrix.to_numpy() * money
+    return pd.DataFrame(pnl, index=scenarios.index, columns=weight_matrix.columns)
+
+
+def worst_scenarios(pnl, n=10, portfolio=None):
+    portfolio = pnl.columns[0] if portfolio is None else portfolio
+    return pnl.nsmallest(n, portfolio)
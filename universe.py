@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+from scipy.linalg import solve_triangular
+
+
+NOT_POSITIVE_DEFINITE = "Covariance of the selected subset is not positive definite; widen the date window."
+
+
+def _extend_cholesky(L, C12, C22):
+    # Appends assets to an existing factor: [[L, 0], [B, L22]] with B = C21 L^-T,
+    # L22 = chol(C22 - B B^T); only the new rows cost anything
+    B = solve_triangular(L, C12, lower=True).T
+    L22 = np.linalg.cholesky(C22 - B @ B.T)
+    k_old, k_new = L.shape[0], L22.shape[0]
+    extended = np.zeros((k_old + k_new, k_old + k_new))
+    extended[:k_old, :k_old] = L
+    extended[k_old:, :k_old] = B
+    extended[k_old:, k_old:] = L22
+    return extended
+
+
+class MasterModel:
+    # Large-universe model: prefix sums of returns and of their cross-products are kept at
+    # checkpoints every `block` rows, so the moments of any ticker subset and date window
+    # come from two checkpoint differences plus at most 2 * block raw rows of that subset.
+    # Memory is (T / block) * n^2 floats, e.g. ~75 MB for 500 names over nine years.
+    def __init__(self, returns, last_prices=None, excel_file=None, version=0, block=63):
+        if returns.isna().to_numpy().any():
+            raise ValueError("Master returns must not contain missing values.")
+        self.tickers = pd.Index(returns.columns)
+        self.dates = pd.DatetimeIndex(returns.index)
+        self.values = np.ascontiguousarray(returns.to_numpy(), dtype=np.float64)
+        self.values.setflags(write=False)
+        self.last_prices = last_prices
+        self.excel_file = excel_file
+        self.version = version
+        self.block = block
+        self._position = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+        n_rows, n_assets = self.values.shape
+        n_checkpoints = n_rows // block + 1
+        self._sums = np.zeros((n_checkpoints, n_assets))
+        self._cross = np.zeros((n_checkpoints, n_assets, n_assets))
+        for k in range(1, n_checkpoints):
+            rows = self.values[(k - 1) * block:k * block]
+            self._sums[k] = self._sums[k - 1] + rows.sum(axis=0)
+            self._cross[k] = self._cross[k - 1] + rows.T @ rows
+
+    def _indices(self, tickers):
+        missing = [ticker for ticker in tickers if ticker not in self._position]
+        if missing:
+            raise ValueError(f"Tickers not in the master universe: {missing}")
+        return np.array([self._position[ticker] for ticker in tickers], dtype=int)
+
+    def _window(self, start=None, end=None):
+        first = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side="left")
+        last = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side="right")
+        if last - first < 2:
+            raise ValueError("The selected window holds fewer than two return observations.")
+        return first, last
+
+    def _edges(self, first, last):
+        # Checkpoints fully inside [first, last), plus the raw-row ranges left at each edge
+        k_first = -(-first // self.block)
+        k_last = last // self.block
+        if k_first >= k_last:
+            return None, [(first, last)]
+        return (k_first, k_last), [(first, k_first * self.block), (k_last * self.block, last)]
+
+    def _sums_over(self, idx, first, last):
+        checkpoints, edges = self._edges(first, last)
+        sums = np.zeros(len(idx)) if checkpoints is None else self._sums[checkpoints[1], idx] - self._sums[checkpoints[0], idx]
+        for lo, hi in edges:
+            sums = sums + self.values[lo:hi, idx].sum(axis=0)
+        return sums
+
+    def _cross_over(self, rows_idx, cols_idx, first, last):
+        checkpoints, edges = self._edges(first, last)
+        if checkpoints is None:
+            cross = np.zeros((len(rows_idx), len(cols_idx)))
+        else:
+            block = np.ix_(rows_idx, cols_idx)
+            cross = self._cross[checkpoints[1]][block] - self._cross[checkpoints[0]][block]
+        for lo, hi in edges:
+            cross = cross + self.values[lo:hi, rows_idx].T @ self.values[lo:hi, cols_idx]
+        return cross
+
+    def _moments(self, rows_idx, cols_idx, first, last):
+        n = last - first
+        row_sums = self._sums_over(rows_idx, first, last)
+        col_sums = row_sums if cols_idx is rows_idx else self._sums_over(cols_idx, first, last)
+        cov = (self._cross_over(rows_idx, cols_idx, first, last) - np.outer(row_sums, col_sums) / n) / (n - 1)
+        return row_sums / n, cov
+
+    def subset(self, tickers, start=None, end=None):
+        tickers = list(tickers)
+        idx = self._indices(tickers)
+        first, last = self._window(start, end)
+        mean, cov = self._moments(idx, idx, first, last)
+        try:
+            cholesky = np.linalg.cholesky(cov)
+        except np.linalg.LinAlgError:
+            raise ValueError(NOT_POSITIVE_DEFINITE)
+        return SubsetModel(self, tickers, idx, first, last, mean, cov, cholesky, version=self.version)
+
+
+class SubsetModel:
+    # Exposes the same attributes as ModelSnapshot, so PortfolioOptimizer.from_snapshot
+    # and the charting layer accept it unchanged
+    def __init__(self, master, tickers, idx, first, last, mean, cov, cholesky, version=0):
+        self.master = master
+        self.tickers = tuple(tickers)
+        self._idx = idx
+        self._first, self._last = first, last
+        self.start = master.dates[first]
+        self.end = master.dates[last - 1]
+        self.excel_file = master.excel_file
+        self.key = (self.tickers, self.start, self.end, self.excel_file)
+        self.version = version
+        self.n_observations = last - first
+
+        columns = pd.Index(self.tickers)
+        self.pBar = pd.Series(mean, index=columns)
+        self.Sigma = pd.DataFrame(cov, index=columns, columns=columns)
+        self.cholesky = cholesky
+        self.prices = None
+        self.last_prices = None if master.last_prices is None else master.last_prices[list(self.tickers)]
+        self._returns = None
+
+    @property
+    def returns(self):
+        # Built on first use and kept, so every reader of this subset shares one frame. A run
+        # of adjacent master columns is a view; any other selection costs one T x k copy.
+        if self._returns is None:
+            idx = self._idx
+            adjacent = np.array_equal(idx, np.arange(idx[0], idx[0] + len(idx)))
+            columns = slice(idx[0], idx[-1] + 1) if adjacent else idx
+            self._returns = pd.DataFrame(
+                self.master.values[self._first:self._last, columns],
+                index=self.master.dates[self._first:self._last],
+                columns=pd.Index(self.tickers),
+                copy=False,
+            )
+        return self._returns
+
+    def extend(self, tickers):
+        # Adds tickers to this subset over the same window, updating the factor in place of
+        # refactorising the whole covariance
+        new = list(dict.fromkeys(ticker for ticker in tickers if ticker not in self.tickers))
+        if not new:
+            return self
+        new_idx = self.master._indices(new)
+        mean_new, C22 = self.master._moments(new_idx, new_idx, self._first, self._last)
+        _, C12 = self.master._moments(self._idx, new_idx, self._first, self._last)
+        try:
+            cholesky = _extend_cholesky(self.cholesky, C12, C22)
+        except np.linalg.LinAlgError:
+            raise ValueError(NOT_POSITIVE_DEFINITE)
+        cov = np.block([[self.Sigma.to_numpy(), C12], [C12.T, C22]])
+        mean = np.concatenate([self.pBar.to_numpy(), mean_new])
+        return SubsetModel(
+            self.master, list(self.tickers) + new, np.concatenate([self._idx, new_idx]),
+            self._first, self._last, mean, cov, cholesky, version=self.version,
+        )